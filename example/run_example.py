@@ -11,9 +11,11 @@ import os
 # Add parent directory to path so we can import utils
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from utils import Schedule, Override, render_schedule
+from utils import Schedule, Override, render_schedule, format_timestamp
 import json
 
+DISPLAY_FORMAT = '%a %b %d, %I:%M %p'
+
 
 def main():
     # Alice, Bob, Charlie rotating weekly
@@ -41,29 +43,27 @@ def main():
     
     entries = render_schedule(schedule, overrides, from_time, until_time)
     
-    output = []
-    for entry in entries:
-        output.append({
+    output = [
+        {
             'user': entry['user'],
-            'start_at': entry['start_at'].strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'end_at': entry['end_at'].strftime('%Y-%m-%dT%H:%M:%SZ')
-        })
+            'start_at': format_timestamp(entry['start_at']),
+            'end_at': format_timestamp(entry['end_at'])
+        }
+        for entry in entries
+    ]
     
     print(json.dumps(output, indent=2))
     
     for entry in entries:
-        start_str = entry['start_at'].strftime('%a %b %d, %I:%M %p')
-        end_str = entry['end_at'].strftime('%a %b %d, %I:%M %p')
-        duration = entry['end_at'] - entry['start_at']
-        
         # Calculate hours
-        hours = duration.total_seconds() / 3600
+        hours = (entry['end_at'] - entry['start_at']).total_seconds() / 3600
         if hours < 24:
             duration_str = f"{hours:.1f} hours"
         else:
-            days = hours / 24
-            duration_str = f"{days:.1f} days"
+            duration_str = f"{hours / 24:.1f} days"
         
+        start_str = entry['start_at'].strftime(DISPLAY_FORMAT)
+        end_str = entry['end_at'].strftime(DISPLAY_FORMAT)
         print(f"{entry['user']:8} | {start_str} → {end_str} ({duration_str})")
 
 
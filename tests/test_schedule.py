@@ -9,22 +9,33 @@ Tests for the schedule rendering system.
 - Invalid inputs
 """
 
+from collections.abc import Mapping
+import copy
+import dataclasses
+import pickle
+import random
+import numpy as np
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import sys
 import os
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from utils import _kernels, schedule_utils
 from utils import (
     Schedule,
     Override,
+    Entry,
+    ScheduleArray,
     generate_base_schedule,
     apply_overrides,
     render_schedule,
     truncate_to_window,
-    merge_consecutive_entries
+    merge_consecutive_entries,
+    format_timestamp
 )
 
 
@@ -89,6 +100,44 @@ class TestBasicScheduleGeneration:
         assert entries[0]['user'] == 'alice'
         assert entries[1]['user'] == 'bob'
         assert entries[2]['user'] == 'alice'
+    
+    def test_skip_shifts_before_from_time(self):
+        """Test that shifts ending before from_time are not generated."""
+        schedule = Schedule(
+            users=["alice", "bob", "charlie"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        entries = generate_base_schedule(
+            schedule,
+            datetime(2025, 12, 5, 17, 0, 0, tzinfo=timezone.utc),
+            from_time=datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        assert len(entries) == 2
+        assert entries[0]['user'] == 'charlie'
+        assert entries[0]['start_at'] == datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        assert entries[1]['user'] == 'alice'
+
+    
+    def test_user_repeated_in_rotation(self):
+        """Test that back-to-back shifts of a repeated user are merged when rendering."""
+        schedule = Schedule(
+            users=["alice", "alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        from_time = datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 28, 17, 0, 0, tzinfo=timezone.utc)
+        
+        result = render_schedule(schedule, [], from_time, until_time)
+        
+        assert len(result) == 2
+        assert result[0]['user'] == 'alice'
+        assert result[0]['end_at'] == datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        assert result[1]['user'] == 'bob'
 
 
 class TestOverrides:
@@ -272,6 +321,196 @@ class TestChainedOverrides:
         assert entries[2]['user'] == 'alice'
         assert entries[3]['user'] == 'charlie'
         assert entries[4]['user'] == 'alice'
+    
+    def test_override_spanning_shift_boundary(self):
+        """Test an override that crosses a handover stays a single entry."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        base_entries = generate_base_schedule(schedule, datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc))
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 13, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 15, 17, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        entries = apply_overrides(base_entries, overrides)
+        
+        assert [e['user'] for e in entries] == ['alice', 'charlie', 'bob']
+        assert entries[1]['start_at'] == datetime(2025, 11, 13, 17, 0, 0, tzinfo=timezone.utc)
+        assert entries[1]['end_at'] == datetime(2025, 11, 15, 17, 0, 0, tzinfo=timezone.utc)
+    
+    def test_nested_overrides(self):
+        """Test that the later of two overlapping overrides wins while active."""
+        schedule = Schedule(
+            users=["alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        base_entries = generate_base_schedule(schedule, datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc))
+        
+        overrides = [
+            Override(
+                user="bob",
+                start_at=datetime(2025, 11, 8, 9, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 8, 13, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        entries = apply_overrides(base_entries, overrides)
+        
+        assert [e['user'] for e in entries] == ['alice', 'bob', 'charlie', 'bob', 'alice']
+        assert entries[3]['start_at'] == datetime(2025, 11, 8, 13, 0, 0, tzinfo=timezone.utc)
+        assert entries[3]['end_at'] == datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+    
+    def test_override_starting_before_schedule_applies_in_full(self):
+        """Test that an override overlapping a shift is kept whole, even before the schedule starts."""
+        schedule = Schedule(
+            users=["alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 7, 12, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 7, 20, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        result = render_schedule(
+            schedule, overrides,
+            datetime(2025, 11, 7, 0, 0, 0, tzinfo=timezone.utc),
+            datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        assert result[0] == Entry(
+            'charlie',
+            datetime(2025, 11, 7, 12, 0, 0, tzinfo=timezone.utc),
+            datetime(2025, 11, 7, 20, 0, 0, tzinfo=timezone.utc)
+        )
+        assert result[1].user == 'alice'
+        assert result[1].start_at == datetime(2025, 11, 7, 20, 0, 0, tzinfo=timezone.utc)
+    
+    def test_override_on_nested_entries(self):
+        """Test overriding inside an entry that is nested in another one."""
+        base_entries = [
+            {
+                'user': 'alice',
+                'start_at': datetime(2025, 11, 7, 0, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 11, 0, 0, 0, tzinfo=timezone.utc)
+            },
+            {
+                'user': 'bob',
+                'start_at': datetime(2025, 11, 8, 0, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 9, 0, 0, 0, tzinfo=timezone.utc)
+            }
+        ]
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 8, 14, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        entries = apply_overrides(base_entries, overrides)
+        
+        # The later-started entry is on call while it lasts, as with overrides
+        assert [e['user'] for e in entries] == ['alice', 'bob', 'charlie', 'bob', 'alice']
+        assert entries[2]['start_at'] == datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc)
+        assert entries[3]['end_at'] == datetime(2025, 11, 9, 0, 0, 0, tzinfo=timezone.utc)
+        assert entries[4]['end_at'] == datetime(2025, 11, 11, 0, 0, 0, tzinfo=timezone.utc)
+    
+    def test_unsorted_overrides(self):
+        """Test that overrides don't need to be given in start order."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        base_entries = generate_base_schedule(schedule, datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc))
+        
+        overrides = [
+            Override(
+                user="dave",
+                start_at=datetime(2025, 11, 15, 9, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 15, 12, 0, 0, tzinfo=timezone.utc)
+            ),
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 8, 9, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        entries = apply_overrides(base_entries, overrides)
+        
+        assert entries == apply_overrides(base_entries, overrides[::-1])
+        assert [e['user'] for e in entries] == ['alice', 'charlie', 'alice', 'bob', 'dave', 'bob']
+    
+    def test_unsorted_base_entries(self):
+        """Test that base entries don't need to be given in start order."""
+        schedule = Schedule(
+            users=["alice", "bob", "charlie"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        base_entries = generate_base_schedule(schedule, datetime(2025, 11, 28, 17, 0, 0, tzinfo=timezone.utc))
+        
+        overrides = [
+            Override(
+                user="dave",
+                start_at=datetime(2025, 11, 14, 9, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 14, 20, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        entries = apply_overrides(base_entries[::-1], overrides)
+        
+        assert entries == apply_overrides(base_entries, overrides)
+        assert [e['user'] for e in entries] == ['alice', 'dave', 'bob', 'charlie']
+    
+    def test_override_in_gap_between_entries(self):
+        """Test that an override covering no entry leaves the entries unchanged."""
+        base_entries = [
+            {
+                'user': 'alice',
+                'start_at': datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+            },
+            {
+                'user': 'bob',
+                'start_at': datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 11, 17, 0, 0, tzinfo=timezone.utc)
+            }
+        ]
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 9, 9, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 9, 17, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        assert apply_overrides(base_entries, overrides) == base_entries
 
 
 class TestTruncation:
@@ -526,6 +765,152 @@ class TestIntegration:
         assert result[0]['user'] == 'alice'
         assert result[1]['user'] == 'bob'
 
+    
+    def test_render_returns_immutable_entries(self):
+        """Test that rendered entries can't be modified and repeated renders agree."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        from_time = datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        
+        first = render_schedule(schedule, [], from_time, until_time)
+        
+        assert isinstance(first, tuple)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first[0].user = 'mallory'
+        
+        second = render_schedule(schedule, [], from_time, until_time)
+        
+        assert second == first
+        assert second[0] == Entry('alice', from_time, datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc))
+    
+    def test_duplicate_overrides(self):
+        """Test that repeating an override doesn't change the result."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        override = Override(
+            user="charlie",
+            start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+            end_at=datetime(2025, 11, 10, 22, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        from_time = datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        
+        result = render_schedule(schedule, [override, override], from_time, until_time)
+        
+        assert result == render_schedule(schedule, [override], from_time, until_time)
+        assert [e.user for e in result] == ['alice', 'charlie', 'alice', 'bob']
+    
+    def test_entry_dict_access(self):
+        """Test that entries support dict-style access to their fields."""
+        entry = Entry(
+            'alice',
+            datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        assert entry['user'] == entry.user
+        assert entry['start_at'] == entry.start_at
+        assert entry['end_at'] == entry.end_at
+        with pytest.raises(KeyError):
+            entry['__init__']
+        assert 'user' in entry and 'name' not in entry
+        assert dict(entry) == {'user': entry.user, 'start_at': entry.start_at, 'end_at': entry.end_at}
+        assert isinstance(entry, Mapping)
+        assert len(entry) == 3
+        assert entry.get('user') == 'alice' and entry.get('name') is None
+        assert list(entry.keys()) == ['user', 'start_at', 'end_at']
+        assert list(entry.items()) == [('user', entry.user), ('start_at', entry.start_at), ('end_at', entry.end_at)]
+        assert list(entry.values()) == [entry.user, entry.start_at, entry.end_at]
+    
+    def test_format_timestamp(self):
+        """Test that timestamps are formatted in UTC whatever their tzinfo."""
+        assert format_timestamp(datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)) == '2025-11-07T17:00:00Z'
+        assert format_timestamp(datetime(2025, 11, 7, 17, 0, 0)) == '2025-11-07T17:00:00Z'
+        assert format_timestamp(datetime(2025, 10, 20, 17, 0, 0, tzinfo=ZoneInfo('Europe/London'))) == '2025-10-20T16:00:00Z'
+        assert format_timestamp(datetime(2025, 11, 7, 17, 0, 0, 500, tzinfo=timezone.utc)) == '2025-11-07T17:00:00Z'
+    
+    def test_rendered_entries_feed_stage_functions(self):
+        """Test that render_schedule output can be passed back into the stage functions."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 10, 22, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        from_time = datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        
+        entries = render_schedule(schedule, overrides, from_time, until_time)
+        as_dicts = [dict(e) for e in entries]
+        
+        assert merge_consecutive_entries(entries) == as_dicts
+        assert truncate_to_window(entries, from_time, until_time) == as_dicts
+        assert apply_overrides(entries, overrides) == as_dicts
+    
+    def test_models_are_immutable(self):
+        """Test that schedules and overrides are frozen and hashable."""
+        schedule = Schedule(
+            users=["alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        override = Override(
+            user="bob",
+            start_at=datetime(2025, 11, 8, 9, 0, 0, tzinfo=timezone.utc),
+            end_at=datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            schedule.handover_interval_days = 1
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            override.user = "charlie"
+        
+        assert hash(schedule) == hash(dataclasses.replace(schedule))
+        assert hash(override) == hash(dataclasses.replace(override))
+        assert not hasattr(schedule, '__dict__')
+        assert not hasattr(override, '__dict__')
+    
+    def test_models_pickle_and_copy(self):
+        """Test that schedules and overrides survive pickling and copying."""
+        schedule = Schedule(
+            users=["alice", "bob", "alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        override = Override(
+            user="bob",
+            start_at=datetime(2025, 11, 8, 9, 0, 0, tzinfo=timezone.utc),
+            end_at=datetime(2025, 11, 8, 12, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        for model in (schedule, override):
+            assert pickle.loads(pickle.dumps(model)) == model
+            assert copy.deepcopy(model) == model
+        assert dataclasses.asdict(schedule)['users'] == ("alice", "bob", "alice")
+        
+        from_time = datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 28, 17, 0, 0, tzinfo=timezone.utc)
+        assert render_schedule(pickle.loads(pickle.dumps(schedule)), [override], from_time, until_time) == \
+            render_schedule(schedule, [override], from_time, until_time)
+
 
 class TestInvalidInputs:
     """Test handling of invalid inputs."""
@@ -591,6 +976,21 @@ class TestInvalidInputs:
         # Should return empty result
         assert len(result) == 0
     
+    def test_until_before_from_within_shift(self):
+        """Test render_schedule where until is before from inside the same shift."""
+        schedule = Schedule(
+            users=["alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        from_time = datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 9, 17, 0, 0, tzinfo=timezone.utc)
+        
+        result = render_schedule(schedule, [], from_time, until_time)
+        
+        assert len(result) == 0
+    
     def test_window_before_schedule_start(self):
         """Test time window that's entirely before schedule starts."""
         schedule = Schedule(
@@ -698,4 +1098,372 @@ class TestEdgeCases:
         # Should cycle through first 10 users
         assert result[0]['user'] == 'user0'
         assert result[9]['user'] == 'user9'
+    
+    def test_window_starting_before_schedule_start(self):
+        """Test a window that opens before handover_start_at."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        from_time = datetime(2025, 11, 1, 0, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 17, 0, 0, 0, tzinfo=timezone.utc)
+        
+        result = render_schedule(schedule, [], from_time, until_time)
+        
+        assert len(result) == 2
+        assert result[0]['user'] == 'alice'
+        assert result[0]['start_at'] == schedule.handover_start_at
+        assert result[1]['user'] == 'bob'
+        assert result[1]['end_at'] == until_time
+    
+    def test_window_far_after_schedule_start(self):
+        """Test a window many rotations after handover_start_at."""
+        schedule = Schedule(
+            users=["alice", "bob", "charlie"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        # 3000 weeks later is a multiple of the 3-week rotation, so alice is on
+        from_time = datetime(2083, 5, 7, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2083, 5, 14, 17, 0, 0, tzinfo=timezone.utc)
+        
+        result = render_schedule(schedule, [], from_time, until_time)
+        
+        assert len(result) == 1
+        assert result[0]['user'] == 'alice'
+        assert result[0]['start_at'] == from_time
+        assert result[0]['end_at'] == until_time
+    
+    def test_naive_datetimes_stay_naive(self):
+        """Test that naive inputs give naive outputs from every stage."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 1, 1),
+            handover_interval_days=1
+        )
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 1, 1, 5, 0, 0),
+                end_at=datetime(2025, 1, 1, 7, 0, 0)
+            )
+        ]
+        
+        entries = generate_base_schedule(schedule, datetime(2025, 1, 3))
+        entries = apply_overrides(entries, overrides)
+        entries = truncate_to_window(entries, datetime(2025, 1, 1, 1, 0, 0), datetime(2025, 1, 2))
+        entries = merge_consecutive_entries(entries)
+        
+        assert all(e['start_at'].tzinfo is None and e['end_at'].tzinfo is None for e in entries)
+        assert entries[0]['start_at'] == datetime(2025, 1, 1, 1, 0, 0)
+        
+        result = render_schedule(schedule, overrides, datetime(2025, 1, 1), datetime(2025, 1, 2))
+        
+        assert [e.user for e in result] == ['alice', 'charlie', 'alice']
+        assert result[1].start_at == datetime(2025, 1, 1, 5, 0, 0)
+        assert result[-1].end_at == datetime(2025, 1, 2)
+    
+    @pytest.mark.parametrize('small_render_size', [64, 0])
+    def test_handovers_keep_wall_clock_time_across_dst(self, monkeypatch, small_render_size):
+        """Test that handovers stay at the same local time when the clocks change."""
+        monkeypatch.setattr(schedule_utils, '_SMALL_RENDER_SIZE', small_render_size)
+        schedule_utils._render_entries.cache_clear()
+        london = ZoneInfo('Europe/London')
+        schedule = Schedule(
+            users=["alice", "bob"],
+            # BST; the clocks go back on 2025-10-26
+            handover_start_at=datetime(2025, 10, 20, 17, 0, 0, tzinfo=london),
+            handover_interval_days=7
+        )
+        
+        handovers = [
+            datetime(2025, 10, 20, 17, 0, 0, tzinfo=london),
+            datetime(2025, 10, 27, 17, 0, 0, tzinfo=london),
+            datetime(2025, 11, 3, 17, 0, 0, tzinfo=london),
+            datetime(2025, 11, 10, 17, 0, 0, tzinfo=london)
+        ]
+        
+        base = generate_base_schedule(schedule, handovers[-1])
+        
+        assert [(e['start_at'], e['end_at']) for e in base] == list(zip(handovers, handovers[1:]))
+        # The shift spanning the change is an hour longer in absolute time
+        assert base[0]['end_at'].astimezone(timezone.utc) - base[0]['start_at'].astimezone(timezone.utc) == timedelta(days=7, hours=1)
+        
+        result = render_schedule(schedule, [], handovers[0], handovers[-1])
+        
+        assert [(e.user, e.start_at, e.end_at) for e in result] == [
+            ('alice', handovers[0], handovers[1]),
+            ('bob', handovers[1], handovers[2]),
+            ('alice', handovers[2], handovers[3])
+        ]
+        assert all(e.start_at.tzinfo is london and e.end_at.tzinfo is london for e in result)
+        assert [e.start_at.utcoffset() for e in result] == [timedelta(hours=1), timedelta(0), timedelta(0)]
+        
+        # A window opening just before a later handover still finds the right shift
+        late = render_schedule(schedule, [], datetime(2025, 11, 3, 16, 30, 0, tzinfo=london), handovers[-1])
+        
+        assert [(e.user, e.start_at.hour, e.start_at.minute) for e in late] == [('bob', 16, 30), ('alice', 17, 0)]
 
+
+class TestScheduleArray:
+    """Test the columnar schedule representation."""
+    
+    def test_round_trip(self):
+        """Test that entries survive conversion to and from ScheduleArray."""
+        entries = [
+            {
+                'user': 'alice',
+                'start_at': datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 10, 17, 0, 0, 500, tzinfo=timezone.utc)
+            },
+            {
+                'user': 'bob',
+                'start_at': datetime(2025, 11, 10, 17, 0, 0, 500, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc)
+            }
+        ]
+        
+        table = ScheduleArray.from_entries(entries)
+        
+        assert len(table) == 2
+        assert table.users == ['alice', 'bob']
+        assert table.to_entries() == entries
+    
+    def test_columnar_pipeline(self):
+        """Test that the stage functions can be chained on a ScheduleArray."""
+        schedule = Schedule(
+            users=["alice", "bob", "charlie"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 10, 22, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        from_time = datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        
+        table = generate_base_schedule(schedule, until_time, as_array=True)
+        table = apply_overrides(table, overrides)
+        table = truncate_to_window(table, from_time, until_time)
+        table = merge_consecutive_entries(table)
+        
+        assert isinstance(table, ScheduleArray)
+        assert table.to_entry_tuple() == render_schedule(schedule, overrides, from_time, until_time)
+    
+    def test_render_as_columns(self):
+        """Test that as_columns returns the same entries as column arrays."""
+        schedule = Schedule(
+            users=["alice", "bob"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=7
+        )
+        
+        overrides = [
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 10, 22, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        from_time = datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+        
+        columns = render_schedule(schedule, overrides, from_time, until_time, as_columns=True)
+        entries = render_schedule(schedule, overrides, from_time, until_time)
+        
+        assert columns['user'].tolist() == [e.user for e in entries]
+        assert [t.replace(tzinfo=timezone.utc) for t in columns['start_at'].tolist()] == [e.start_at for e in entries]
+        assert [t.replace(tzinfo=timezone.utc) for t in columns['end_at'].tolist()] == [e.end_at for e in entries]
+        
+        empty = render_schedule(schedule, overrides, until_time, from_time, as_columns=True)
+        assert [len(column) for column in empty.values()] == [0, 0, 0]
+        
+        for result in (columns, empty):
+            assert not result['start_at'].flags.writeable
+            assert not result['end_at'].flags.writeable
+    
+    def test_small_render_matches_array_pipeline(self, monkeypatch):
+        """Test that small windows, rendered without NumPy, match the array pipeline."""
+        schedule = Schedule(
+            users=["alice", "bob", "alice"],
+            handover_start_at=datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+            handover_interval_days=2
+        )
+        
+        overrides = [
+            # Starts before the schedule, so applies from the window start
+            Override(
+                user="charlie",
+                start_at=datetime(2025, 11, 6, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            Override(
+                user="bob",
+                start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 13, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            # Same start as the next one, which wins as it comes later
+            Override(
+                user="dave",
+                start_at=datetime(2025, 11, 11, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 12, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            Override(
+                user="alice",
+                start_at=datetime(2025, 11, 11, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 11, 22, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        from_time = datetime(2025, 11, 6, 12, 0, 0, tzinfo=timezone.utc)
+        until_time = datetime(2025, 11, 16, 12, 0, 0, tzinfo=timezone.utc)
+        
+        small = render_schedule(schedule, overrides, from_time, until_time)
+        
+        schedule_utils._render_entries.cache_clear()
+        monkeypatch.setattr(schedule_utils, '_SMALL_RENDER_SIZE', 0)
+        
+        assert render_schedule(schedule, overrides, from_time, until_time) == small
+        assert [(e.user, e.start_at.day, e.end_at.day) for e in small] == [
+            ('charlie', 6, 8), ('alice', 8, 9), ('bob', 9, 11), ('alice', 11, 11),
+            ('dave', 11, 12), ('bob', 12, 13), ('alice', 13, 15), ('bob', 15, 16)
+        ]
+    
+    @pytest.mark.parametrize('tz', [timezone.utc, None, ZoneInfo('Europe/London')], ids=['utc', 'naive', 'london'])
+    @pytest.mark.parametrize('seed', range(10))
+    def test_small_render_parity(self, monkeypatch, tz, seed):
+        """Test that the small-window path matches the array pipeline on random inputs."""
+        rng = random.Random(seed)
+        # Two days before the October DST change in London
+        handover_start_at = datetime(2025, 10, 24, 17, 0, 0, tzinfo=tz)
+        
+        for _ in range(20):
+            schedule = Schedule(
+                users=rng.choices(["alice", "bob", "charlie"], k=rng.randint(1, 4)),
+                handover_start_at=handover_start_at,
+                handover_interval_days=rng.randint(1, 3)
+            )
+            
+            overrides = []
+            for _ in range(rng.randint(0, 8)):
+                # Overlapping each other, some starting before the schedule,
+                # and some starting exactly when an earlier one does
+                if overrides and rng.random() < 0.25:
+                    start_at = rng.choice(overrides).start_at
+                else:
+                    start_at = handover_start_at + timedelta(hours=rng.randint(-72, 400))
+                overrides.append(Override(
+                    user=rng.choice(["alice", "bob", "dave"]),
+                    start_at=start_at,
+                    end_at=start_at + timedelta(hours=rng.randint(1, 100))
+                ))
+            
+            from_time = handover_start_at + timedelta(hours=rng.randint(-100, 300))
+            until_time = from_time + timedelta(hours=rng.randint(1, 300))
+            
+            monkeypatch.setattr(schedule_utils, '_SMALL_RENDER_SIZE', 64)
+            small = render_schedule(schedule, overrides, from_time, until_time)
+            
+            schedule_utils._render_entries.cache_clear()
+            monkeypatch.setattr(schedule_utils, '_SMALL_RENDER_SIZE', 0)
+            
+            assert render_schedule(schedule, overrides, from_time, until_time) == small
+            assert all(e.start_at.tzinfo is tz and e.end_at.tzinfo is tz for e in small)
+    
+    def test_override_users_interned(self):
+        """Test that override users get ids after the existing users, once each."""
+        table = ScheduleArray.from_entries([
+            {
+                'user': 'alice',
+                'start_at': datetime(2025, 11, 7, 17, 0, 0, tzinfo=timezone.utc),
+                'end_at': datetime(2025, 11, 14, 17, 0, 0, tzinfo=timezone.utc)
+            }
+        ])
+        
+        overrides = [
+            Override(
+                user="dave",
+                start_at=datetime(2025, 11, 8, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 9, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            Override(
+                user="dave",
+                start_at=datetime(2025, 11, 10, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 11, 17, 0, 0, tzinfo=timezone.utc)
+            ),
+            # Entirely after the shift, so never applied
+            Override(
+                user="erin",
+                start_at=datetime(2025, 11, 20, 17, 0, 0, tzinfo=timezone.utc),
+                end_at=datetime(2025, 11, 21, 17, 0, 0, tzinfo=timezone.utc)
+            )
+        ]
+        
+        result = apply_overrides(table, overrides)
+        
+        assert result.users == ['alice', 'dave']
+        assert result.user_ids.tolist() == [0, 1, 0, 1, 0]
+    
+    def test_empty(self):
+        """Test converting an empty list of entries."""
+        table = ScheduleArray.from_entries([])
+        
+        assert len(table) == 0
+        assert table.to_entries() == []
+
+
+class TestKernels:
+    """Test how the numeric kernels are compiled."""
+    
+    @staticmethod
+    def sweep_inputs():
+        """Three back-to-back base intervals and two overlapping overrides."""
+        return (
+            np.array([0, 10, 20], dtype=np.int64),
+            np.array([10, 20, 30], dtype=np.int64),
+            np.array([0, 1, 0], dtype=np.int32),
+            np.array([5, 8], dtype=np.int64),
+            np.array([15, 9], dtype=np.int64),
+            np.array([2, 3], dtype=np.int32)
+        )
+    
+    # The plain Python result for sweep_inputs
+    EXPECTED = ([0, 5, 8, 9, 15, 20], [5, 8, 9, 15, 20, 30], [0, 2, 3, 2, 1, 0])
+    
+    def run(self, monkeypatch, min_size):
+        """Run the sweep through a freshly wrapped kernel, with numba not yet loaded."""
+        monkeypatch.setattr(_kernels, '_NUMBA', None)
+        monkeypatch.setattr(_kernels, '_JIT_MIN_SIZE', min_size)
+        sweep = _kernels._jit(_kernels.sweep_overrides.__wrapped__)
+        return tuple(column.tolist() for column in sweep(*self.sweep_inputs()))
+    
+    def test_small_input_skips_numba(self, monkeypatch):
+        """Test that inputs below the threshold run uncompiled without importing numba."""
+        assert self.run(monkeypatch, min_size=1000) == self.EXPECTED
+        assert _kernels._NUMBA is None
+    
+    def test_disabled_numba(self, monkeypatch):
+        """Test that UTILS_DISABLE_NUMBA falls back to the plain kernel."""
+        monkeypatch.setenv('UTILS_DISABLE_NUMBA', '1')
+        
+        assert self.run(monkeypatch, min_size=0) == self.EXPECTED
+        assert _kernels._NUMBA is False
+    
+    def test_compiled_matches_plain(self, monkeypatch):
+        """Test that the numba-compiled sweep gives the same result as plain Python."""
+        numba = pytest.importorskip('numba')
+        monkeypatch.delenv('UTILS_DISABLE_NUMBA', raising=False)
+        
+        assert self.run(monkeypatch, min_size=0) == self.EXPECTED
+        assert _kernels._NUMBA is numba
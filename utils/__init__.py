@@ -3,20 +3,26 @@
 from .schedule_utils import (
     Schedule,
     Override,
+    Entry,
+    ScheduleArray,
     generate_base_schedule,
     apply_overrides,
     render_schedule,
     truncate_to_window,
-    merge_consecutive_entries
+    merge_consecutive_entries,
+    format_timestamp
 )
 
 __all__ = [
     'Schedule',
     'Override',
+    'Entry',
+    'ScheduleArray',
     'generate_base_schedule',
     'apply_overrides',
     'render_schedule',
     'truncate_to_window',
-    'merge_consecutive_entries'
+    'merge_consecutive_entries',
+    'format_timestamp'
 ]
 
@@ -0,0 +1,164 @@
+"""
+Numeric kernels for the schedule pipeline.
+
+Kernels operate on int64 epoch-microsecond arrays and int32 user ids. When
+numba is installed they are JIT-compiled (and cached on disk) the first time
+they see a large input; otherwise they run as plain NumPy/Python. Set
+UTILS_DISABLE_NUMBA=1 to always use the plain Python path.
+"""
+
+import functools
+import os
+import numpy as np
+
+# Larger than any event time
+_NO_EVENT = np.iinfo(np.int64).max
+
+# Kernels are compiled once the total number of elements across their
+# arguments reaches this; importing numba and loading a cached kernel takes
+# ~0.4s, about what the plain sweep needs for 50k intervals
+_JIT_MIN_SIZE = 150_000
+
+# The numba module once loaded, False if it is unavailable or disabled, None
+# until a kernel first runs; numba adds hundreds of ms to import time, so it
+# is only imported when actually needed
+_NUMBA = None
+
+
+def _load_numba():
+    """Return the numba module, or False if it is unavailable or disabled."""
+    global _NUMBA
+    if _NUMBA is None:
+        if os.environ.get('UTILS_DISABLE_NUMBA', '') not in ('', '0'):
+            _NUMBA = False
+        else:
+            try:
+                import numba
+            except ImportError:
+                _NUMBA = False
+            else:
+                _NUMBA = numba
+    return _NUMBA
+
+
+def _jit(func):
+    """
+    Compile func with numba the first time it is called on a large input.
+
+    Until then func runs as plain Python: for small inputs importing numba
+    and loading the compiled kernel costs far more than the kernel itself.
+    Once compiled, the compiled version is used for every input size.
+    """
+    compiled = None
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        nonlocal compiled
+        if compiled is None:
+            if sum(len(arg) for arg in args) < _JIT_MIN_SIZE:
+                return func(*args)
+            numba = _load_numba()
+            compiled = numba.njit(cache=True, nogil=True)(func) if numba else func
+        return compiled(*args)
+
+    return wrapper
+
+
+@_jit
+def sweep_overrides(base_starts, base_ends, base_users, ov_starts, ov_ends, ov_users):
+    """
+    Overlay overrides on base intervals with a single sweep over their events.
+
+    Overrides beat base intervals and, among overlapping overrides, the one
+    that started last wins. Overrides are emitted in full, even where no
+    base interval is active. Returns the starts, ends and user ids of the
+    resulting intervals.
+
+    Both base intervals and overrides must be sorted by start time. The four
+    event streams (base/override starts and ends) are then each sorted and
+    are merged with a pointer per stream that only moves forward, rather
+    than sorting all events together.
+    """
+    n = len(base_starts)
+    m = len(ov_starts)
+
+    # Base ends are already sorted when base intervals don't overlap, which
+    # is the usual case; override ends have to be sorted
+    base_end_order = np.arange(n)
+    for k in range(1, n):
+        if base_ends[k] < base_ends[k - 1]:
+            base_end_order = np.argsort(base_ends, kind='mergesort')
+            break
+    ov_end_order = np.argsort(ov_ends, kind='mergesort')
+
+    # Intervals [0, n) are base entries, [n, n + m) are overrides
+    ended = np.zeros(n + m, dtype=np.bool_)
+    base_stack = np.empty(n, dtype=np.int64)
+    override_stack = np.empty(m, dtype=np.int64)
+    n_base = 0
+    n_override = 0
+
+    out_starts = np.empty(2 * (n + m), dtype=np.int64)
+    out_ends = np.empty(2 * (n + m), dtype=np.int64)
+    out_users = np.empty(2 * (n + m), dtype=np.int32)
+    n_out = 0
+
+    # Next unread event in each stream
+    base_start_i = 0
+    base_end_i = 0
+    ov_start_i = 0
+    ov_end_i = 0
+
+    top = -1
+    segment_start = 0
+    while base_end_i < n or ov_end_i < m:
+        t = _NO_EVENT
+        if base_end_i < n:
+            t = min(t, base_ends[base_end_order[base_end_i]])
+        if ov_end_i < m:
+            t = min(t, ov_ends[ov_end_order[ov_end_i]])
+        if base_start_i < n:
+            t = min(t, base_starts[base_start_i])
+        if ov_start_i < m:
+            t = min(t, ov_starts[ov_start_i])
+
+        # Ends before starts, so back-to-back intervals never overlap, and
+        # base entries start before overrides
+        while base_end_i < n and base_ends[base_end_order[base_end_i]] == t:
+            ended[base_end_order[base_end_i]] = True
+            base_end_i += 1
+        while ov_end_i < m and ov_ends[ov_end_order[ov_end_i]] == t:
+            ended[n + ov_end_order[ov_end_i]] = True
+            ov_end_i += 1
+        while base_start_i < n and base_starts[base_start_i] == t:
+            base_stack[n_base] = base_start_i
+            n_base += 1
+            base_start_i += 1
+        while ov_start_i < m and ov_starts[ov_start_i] == t:
+            override_stack[n_override] = n + ov_start_i
+            n_override += 1
+            ov_start_i += 1
+
+        # Drop intervals that have ended from the top of each stack
+        while n_override and ended[override_stack[n_override - 1]]:
+            n_override -= 1
+        while n_base and ended[base_stack[n_base - 1]]:
+            n_base -= 1
+
+        if n_override:
+            new_top = override_stack[n_override - 1]
+        elif n_base:
+            new_top = base_stack[n_base - 1]
+        else:
+            new_top = -1
+
+        if new_top != top:
+            if top != -1 and segment_start < t:
+                out_starts[n_out] = segment_start
+                out_ends[n_out] = t
+                out_users[n_out] = base_users[top] if top < n else ov_users[top - n]
+                n_out += 1
+            top = new_top
+            segment_start = t
+
+    return out_starts[:n_out], out_ends[:n_out], out_users[:n_out]
@@ -1,11 +1,21 @@
 """Utility functions for processing schedule entries."""
 
-from datetime import datetime, timedelta
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+import functools
+from operator import itemgetter
+from types import MappingProxyType
+import numpy as np
 import pydantic
+import pydantic.dataclasses
 
+from . import _kernels
 
-class Schedule(pydantic.BaseModel):
-    users: list[str]
+
+@pydantic.dataclasses.dataclass(frozen=True, slots=True)
+class Schedule:
+    users: tuple[str, ...]
     handover_start_at: datetime
     handover_interval_days: int
     
@@ -18,13 +28,14 @@ class Schedule(pydantic.BaseModel):
     
     @pydantic.field_validator('users')
     @classmethod
-    def validate_users(cls, v: list[str]) -> list[str]:
+    def validate_users(cls, v: tuple[str, ...]) -> tuple[str, ...]:
         if not v:
             raise ValueError('users list cannot be empty')
         return v
 
 
-class Override(pydantic.BaseModel):
+@pydantic.dataclasses.dataclass(frozen=True, slots=True)
+class Override:
     user: str
     start_at: datetime
     end_at: datetime
@@ -36,39 +47,399 @@ class Override(pydantic.BaseModel):
         return self
 
 
-def generate_base_schedule(schedule: Schedule, until_time: datetime) -> list[dict]:
+@functools.lru_cache(maxsize=64)
+def _intern_users(users: tuple[str, ...]) -> tuple[Mapping[str, int], np.ndarray]:
+    """
+    Intern a rotation's users as integer ids.
+
+    Returns a mapping from each distinct user to its id (ids follow first
+    appearance in users) and the id of each rotation slot, as a read-only
+    array. Cached per rotation rather than stored on Schedule, so schedules
+    stay plain, picklable values.
+    """
+    user_index = {user: i for i, user in enumerate(dict.fromkeys(users))}
+    rotation_ids = np.array([user_index[user] for user in users], dtype=np.int32)
+    rotation_ids.setflags(write=False)
+    return MappingProxyType(user_index), rotation_ids
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def _to_epoch(dt: datetime) -> int:
+    """Convert a datetime to integer microseconds since the Unix epoch. Naive datetimes are treated as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    # Plain integer arithmetic on the timedelta's fields, rather than
+    # dividing it by another timedelta
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_epoch(us: int, tz: tzinfo | None = timezone.utc) -> datetime:
+    """Convert integer microseconds since the Unix epoch to a datetime in tz, or a naive UTC one if tz is None."""
+    if tz is None:
+        return _NAIVE_EPOCH + us * _MICROSECOND
+    dt = _EPOCH + us * _MICROSECOND
+    return dt if tz is timezone.utc else dt.astimezone(tz)
+
+
+def _has_fixed_offset(tz: tzinfo | None) -> bool:
+    """Return whether tz is a single UTC offset (or naive), i.e. has no DST changes."""
+    # Zones with DST changes can only give an offset for a particular datetime
+    return tz is None or tz.utcoffset(None) is not None
+
+
+@dataclass(frozen=True, slots=True)
+class Entry(Mapping):
+    """
+    A single rendered schedule entry.
+
+    Entries are also read-only mappings of their fields (entry['user'],
+    entry.get('user'), dict(entry)) for code written against the older
+    list-of-dicts output, including the stage functions themselves.
+    """
+    user: str
+    start_at: datetime
+    end_at: datetime
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+@dataclass
+class ScheduleArray:
+    """
+    Columnar (structure-of-arrays) form of a list of schedule entries.
+
+    Entry i covers [starts[i], ends[i]) and belongs to users[user_ids[i]].
+    Times are stored as int64 microseconds since the Unix epoch, the same
+    resolution as datetime, so converting to and from entries is lossless.
+    tz is the tzinfo the times convert back to, None for naive datetimes
+    (which are treated as UTC).
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    user_ids: np.ndarray
+    users: list[str]
+    tz: tzinfo | None = timezone.utc
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_entries(cls, entries: list[dict]) -> 'ScheduleArray':
+        """Build a ScheduleArray from a list of entry dicts."""
+        # Intern user names as ids in order of first appearance
+        users: dict[str, int] = {}
+        return cls(
+            starts=np.array([_to_epoch(e['start_at']) for e in entries], dtype=np.int64),
+            ends=np.array([_to_epoch(e['end_at']) for e in entries], dtype=np.int64),
+            user_ids=np.array([users.setdefault(e['user'], len(users)) for e in entries], dtype=np.int32),
+            users=list(users),
+            tz=entries[0]['start_at'].tzinfo if entries else timezone.utc
+        )
+
+    def _datetimes(self) -> tuple[list[datetime], list[datetime]]:
+        """
+        Return the start and end times as datetimes in tz.
+
+        Where an entry ends where the next starts, as is usual, both share one
+        datetime rather than converting the same time twice.
+        """
+        if len(self) == 0:
+            return [], []
+        tz = self.tz
+        starts = [_from_epoch(ts, tz) for ts in self.starts.tolist()]
+        shared = (self.ends[:-1] == self.starts[1:]).tolist()
+        ends = [
+            next_start if is_shared else _from_epoch(end, tz)
+            for end, next_start, is_shared in zip(self.ends[:-1].tolist(), starts[1:], shared)
+        ]
+        ends.append(_from_epoch(int(self.ends[-1]), tz))
+        return starts, ends
+
+    def to_entries(self) -> list[dict]:
+        """Convert back to a list of entry dicts, with datetimes in tz."""
+        users = self.users
+        return [
+            {'user': users[uid], 'start_at': start, 'end_at': end}
+            for uid, start, end in zip(self.user_ids.tolist(), *self._datetimes())
+        ]
+
+    def to_entry_tuple(self) -> tuple[Entry, ...]:
+        """Convert to a tuple of immutable Entry objects, with datetimes in tz."""
+        users = self.users
+        return tuple(
+            Entry(users[uid], start, end)
+            for uid, start, end in zip(self.user_ids.tolist(), *self._datetimes())
+        )
+
+
+def _empty_array(users: list[str], tz: tzinfo | None = timezone.utc) -> ScheduleArray:
+    """Return a ScheduleArray with no entries."""
+    return ScheduleArray(
+        starts=np.empty(0, dtype=np.int64),
+        ends=np.empty(0, dtype=np.int64),
+        user_ids=np.empty(0, dtype=np.int32),
+        users=users,
+        tz=tz
+    )
+
+
+def _shift_start(schedule: Schedule, i: int) -> int:
+    """Return when shift i starts, in epoch microseconds."""
+    return _to_epoch(schedule.handover_start_at + i * timedelta(days=schedule.handover_interval_days))
+
+
+def _shift_range(schedule: Schedule, until_ts: int, from_ts: int | None = None) -> tuple[int, int]:
+    """Return the range [first, last) of the shifts overlapping the window, on epoch-microsecond times."""
+    start = _to_epoch(schedule.handover_start_at)
+    interval = schedule.handover_interval_days * _MICROSECONDS_PER_DAY
+
+    # Shift i covers [start + i * interval, start + (i + 1) * interval), so the
+    # shifts overlapping the window can be found directly without generating
+    # everything since handover_start_at
+    first = max(0, (from_ts - start) // interval) if from_ts is not None else 0
+    # Number of shifts starting before until_time (ceil division)
+    last = -(-(until_ts - start) // interval)
+
+    if not _has_fixed_offset(schedule.handover_start_at.tzinfo):
+        # Handovers keep their wall-clock time across DST changes, so the
+        # estimates above can be a shift out either way; step to the exact
+        # range
+        if from_ts is not None:
+            while first > 0 and _shift_start(schedule, first) > from_ts:
+                first -= 1
+            while _shift_start(schedule, first + 1) <= from_ts:
+                first += 1
+        while last > 0 and _shift_start(schedule, last - 1) >= until_ts:
+            last -= 1
+        while _shift_start(schedule, last) < until_ts:
+            last += 1
+    return first, last
+
+
+def _shift_bounds(schedule: Schedule, first: int, last: int) -> np.ndarray:
+    """
+    Return the boundaries of shifts first to last - 1, in epoch microseconds.
+
+    Shift first + k covers [bounds[k], bounds[k + 1]).
+    """
+    if _has_fixed_offset(schedule.handover_start_at.tzinfo):
+        start = _to_epoch(schedule.handover_start_at)
+        interval = schedule.handover_interval_days * _MICROSECONDS_PER_DAY
+        return start + np.arange(first, last + 1, dtype=np.int64) * interval
+    # As in the baseline, each handover is handover_start_at plus whole days
+    # of wall-clock time, so shifts spanning a DST change are an hour longer
+    # or shorter; that needs the zone's offset at each one
+    return np.array([_shift_start(schedule, i) for i in range(first, last + 1)], dtype=np.int64)
+
+
+def _generate_base_array(schedule: Schedule, until_ts: int, from_ts: int | None = None, clip: bool = False) -> ScheduleArray:
+    """
+    Vectorized core of generate_base_schedule, on epoch-microsecond times.
+
+    With clip (which needs from_ts), the first and last shifts are also cut
+    to the window, so the shifts exactly cover it.
+    """
+    user_index, rotation_ids = _intern_users(schedule.users)
+    tz = schedule.handover_start_at.tzinfo
+    if from_ts is not None and until_ts <= from_ts:
+        return _empty_array(list(user_index), tz)
+    first, last = _shift_range(schedule, until_ts, from_ts)
+
+    if last <= first:
+        return _empty_array(list(user_index), tz)
+
+    bounds = _shift_bounds(schedule, first, last)
+    starts = bounds[:-1].copy()
+    ends = bounds[1:].copy()
+    if clip:
+        # Only the first and last shifts can extend past the window
+        starts[0] = max(starts[0], from_ts)
+        ends[-1] = min(ends[-1], until_ts)
+    return ScheduleArray(
+        starts=starts,
+        ends=ends,
+        # Shift i belongs to rotation slot i % len(users): repeat the rotation,
+        # started at slot first, rather than taking a modulo per shift
+        user_ids=np.resize(np.roll(rotation_ids, -(first % len(schedule.users))), last - first),
+        users=list(user_index),
+        tz=tz
+    )
+
+
+def generate_base_schedule(schedule: Schedule, until_time: datetime, from_time: datetime | None = None, as_array: bool = False) -> list[dict] | ScheduleArray:
     """
     Generate base schedule entries based on the rotation configuration.
     
     This creates shifts for each user in rotation, starting from handover_start_at
     and continuing until we reach or exceed until_time.
     
+    If from_time is given, shifts that end at or before it are skipped, so the
+    work done is proportional to the window rather than the time elapsed
+    since handover_start_at.
+    
     Args:
         schedule: The schedule configuration with users and handover details
         until_time: Generate shifts up to this time
+        from_time: Optionally, skip shifts that end at or before this time
+        as_array: Return a ScheduleArray instead of a list of dicts
         
     Returns:
-        List of schedule entries with user, start_at, and end_at
+        List of schedule entries with user, start_at, and end_at, or a
+        ScheduleArray if as_array is set
     """
-    base_entries = []
-    current_time = schedule.handover_start_at
-    user_index = 0
-    
-    # Generate shifts up to the until_time
-    while current_time < until_time:
-        shift_end = current_time + timedelta(days=schedule.handover_interval_days)
-        base_entries.append({
-            'user': schedule.users[user_index % len(schedule.users)],
-            'start_at': current_time,
-            'end_at': shift_end
-        })
-        current_time = shift_end
-        user_index += 1
-    
-    return base_entries
+    from_ts = _to_epoch(from_time) if from_time is not None else None
+    table = _generate_base_array(schedule, _to_epoch(until_time), from_ts)
+    return table if as_array else table.to_entries()
 
 
-def apply_overrides(base_entries: list[dict], overrides: list[Override]) -> list[dict]:
+def _touched_shifts(table: ScheduleArray, ov_starts: np.ndarray, ov_ends: np.ndarray) -> np.ndarray:
+    """
+    Return a mask of the entries in table that any override overlaps.
+
+    table must be sorted by start and the overrides must be sorted by start.
+    """
+    if np.all(table.ends[1:] >= table.ends[:-1]):
+        # With starts and ends both sorted (no shift nested in another, as in
+        # any base schedule) each override covers a contiguous run of shifts:
+        # from the first ending after it starts up to the last starting before
+        # it ends. Bucket the overrides into those runs by binary search and
+        # mark them with a running count (O(m log n + n))
+        first = np.searchsorted(table.ends, ov_starts, side='right')
+        last = np.searchsorted(table.starts, ov_ends, side='left')
+        counts = np.bincount(first, minlength=len(table) + 1) - np.bincount(last, minlength=len(table) + 1)
+        return np.cumsum(counts[:-1]) > 0
+
+    # Otherwise, of the overrides starting before a shift ends, the latest
+    # end must be after the shift starts (O(n log m))
+    n_before = np.searchsorted(ov_starts, table.ends, side='left')
+    latest_end = np.maximum.accumulate(ov_ends)
+    touched = n_before > 0
+    touched[touched] = latest_end[n_before[touched] - 1] > table.starts[touched]
+    return touched
+
+
+@functools.lru_cache(maxsize=64)
+def _sorted_overrides(overrides: tuple[Override, ...]) -> ScheduleArray:
+    """
+    Return overrides as a ScheduleArray sorted by start.
+
+    This is the form the pipeline works with, so the pydantic models are
+    only read once. Cached, so rendering several windows against the same
+    overrides converts and sorts them once; the returned arrays are
+    read-only.
+    """
+    users: dict[str, int] = {}
+    user_ids = np.array([users.setdefault(o.user, len(users)) for o in overrides], dtype=np.int32)
+    starts = np.array([_to_epoch(o.start_at) for o in overrides], dtype=np.int64)
+    ends = np.array([_to_epoch(o.end_at) for o in overrides], dtype=np.int64)
+    # Overrides usually arrive in start order already
+    if np.any(starts[1:] < starts[:-1]):
+        order = np.argsort(starts, kind='stable')
+        starts, ends, user_ids = starts[order], ends[order], user_ids[order]
+    columns = ScheduleArray(starts, ends, user_ids, list(users))
+    for column in (columns.starts, columns.ends, columns.user_ids):
+        column.setflags(write=False)
+    return columns
+
+
+def _apply_overrides_array(table: ScheduleArray, overrides: tuple[Override, ...], user_index: Mapping[str, int] | None = None) -> ScheduleArray:
+    """
+    Core of apply_overrides, operating on a ScheduleArray.
+
+    user_index maps the names in table.users to their ids; it is built from
+    table.users if not given.
+    """
+    if not overrides or len(table) == 0:
+        return table
+
+    # The sweep needs base entries in start order
+    if np.any(table.starts[1:] < table.starts[:-1]):
+        order = np.argsort(table.starts, kind='stable')
+        table = ScheduleArray(table.starts[order], table.ends[order], table.user_ids[order], table.users, table.tz)
+
+    # Overrides sorted once by start time (O(m log m), cached)
+    ov = _sorted_overrides(overrides)
+
+    # An override applies, in full, if it overlaps any entry: of the entries
+    # starting before it ends, the latest end must be after it starts
+    n_before = np.searchsorted(table.starts, ov.ends, side='left')
+    in_span = n_before > 0
+    in_span[in_span] = np.maximum.accumulate(table.ends)[n_before[in_span] - 1] > ov.starts[in_span]
+    if not in_span.any():
+        return table
+    ov_starts, ov_ends = ov.starts[in_span], ov.ends[in_span]
+
+    if user_index is None:
+        user_index = {user: i for i, user in enumerate(table.users)}
+
+    # Map override user ids to ids in table.users, once per distinct user;
+    # users that only appear in overrides get new ids after the existing ones
+    ov_user_ids = ov.user_ids[in_span]
+    extra_users: dict[str, int] = {}
+    ov_to_table = np.zeros(len(ov.users), dtype=np.int32)
+    for i in np.flatnonzero(np.bincount(ov_user_ids, minlength=len(ov.users))).tolist():
+        user = ov.users[i]
+        uid = user_index.get(user)
+        if uid is None:
+            uid = extra_users.setdefault(user, len(table.users) + len(extra_users))
+        ov_to_table[i] = uid
+    users = table.users + list(extra_users) if extra_users else table.users
+
+    ov_users = ov_to_table[ov_user_ids]
+
+    touched = _touched_shifts(table, ov_starts, ov_ends)
+
+    starts, ends, user_ids = _kernels.sweep_overrides(
+        table.starts[touched], table.ends[touched], table.user_ids[touched],
+        ov_starts, ov_ends, ov_users
+    )
+
+    # Untouched shifts pass through as they are. Both they and the sweep
+    # output are in start order, so binary search where each swept entry
+    # goes among them and fill one preallocated output, rather than
+    # concatenating and sorting again
+    untouched = ~touched
+    n_untouched = len(table) - int(touched.sum())
+    swept_at = np.searchsorted(table.starts[untouched], starts, side='right') + np.arange(len(starts))
+    is_untouched = np.ones(n_untouched + len(starts), dtype=np.bool_)
+    is_untouched[swept_at] = False
+
+    result = ScheduleArray(
+        starts=np.empty(len(is_untouched), dtype=np.int64),
+        ends=np.empty(len(is_untouched), dtype=np.int64),
+        user_ids=np.empty(len(is_untouched), dtype=np.int32),
+        users=users,
+        tz=table.tz
+    )
+    for out, base, swept in (
+        (result.starts, table.starts, starts),
+        (result.ends, table.ends, ends),
+        (result.user_ids, table.user_ids, user_ids)
+    ):
+        out[swept_at] = swept
+        out[is_untouched] = base[untouched]
+    return result
+
+
+def apply_overrides(base_entries: list[dict] | ScheduleArray, overrides: list[Override]) -> list[dict] | ScheduleArray:
     """
     Apply overrides to base schedule entries by splitting shifts.
     
@@ -77,158 +448,288 @@ def apply_overrides(base_entries: list[dict], overrides: list[Override]) -> list
     2. Insert the override
     3. Keep the part of the shift after the override
     
-    Time complexity: O(n × k + m log m)
+    Where overrides overlap each other, the one that started last wins until
+    it ends. An override spanning a shift boundary stays a single entry.
+    
+    Overrides are sorted once and each is bucketed by binary search into the
+    run of shifts it touches; only those shifts go through the sweep, which
+    walks the already sorted shifts and overrides with forward-only pointers.
+    
+    Time complexity: O(m log n + n + k + m log m)
     n = number of shifts in base schedule, 
     m = number of overrides, 
-    k = average number of overrides per shift
+    k = number of shifts touched by an override
     
     Args:
-        base_entries: Base schedule entries to modify
+        base_entries: Base schedule entries to modify, as a list of dicts or a ScheduleArray
         overrides: List of override periods
         
     Returns:
-        Modified schedule entries with overrides applied
+        Modified schedule entries with overrides applied, in the same form as base_entries
     """
     if not overrides:
         return base_entries
-    
-    # Sort all overrides once by start time (O(m log m))
-    sorted_overrides = sorted(overrides, key=lambda o: o.start_at)
-    
-    final_entries = []
-    
-    for entry in base_entries:
-        # Find overrides for this shift using the sorted list
-        overlapping_overrides = [
-            o for o in sorted_overrides
-            if o.start_at < entry['end_at'] and o.end_at > entry['start_at']
-        ]
-        
-        if not overlapping_overrides:
-            final_entries.append(entry) # do nothing
-        else:
-            # Split the entry to insert override
-            current_start = entry['start_at']
-            
-            for override in overlapping_overrides:
-                if current_start < override.start_at:
-                    final_entries.append({
-                        'user': entry['user'],
-                        'start_at': current_start,
-                        'end_at': override.start_at
-                    })
-                
-                final_entries.append({
-                    'user': override.user,
-                    'start_at': override.start_at,
-                    'end_at': override.end_at
-                })
-                
-                current_start = override.end_at
-            
-            if current_start < entry['end_at']:
-                final_entries.append({
-                    'user': entry['user'],
-                    'start_at': current_start,
-                    'end_at': entry['end_at']
-                })
-    
-    return final_entries
-
-
-def render_schedule(schedule: Schedule, overrides: list[Override], from_time: datetime, until_time: datetime) -> list[dict]:
+
+    overrides = tuple(overrides)
+    if isinstance(base_entries, ScheduleArray):
+        return _apply_overrides_array(base_entries, overrides)
+    return _apply_overrides_array(ScheduleArray.from_entries(base_entries), overrides).to_entries()
+
+
+def render_schedule(schedule: Schedule, overrides: list[Override], from_time: datetime, until_time: datetime, as_columns: bool = False) -> tuple[Entry, ...] | dict[str, np.ndarray]:
     """
     Generate schedule entries with overrides applied.
     
     Algorithm:
-    1. Generate base schedule shifts for all users in the rotation
+    1. Generate base schedule shifts overlapping the window
     2. Check for overrides and apply modifications if any exist
     3. Truncate to the requested time window
     4. Merge consecutive entries with the same user
     
+    Results are cached, so repeating a call returns the same tuple.
+    
+    Time complexity: O(n + m log m)
+    n = number of shifts in the window,
+    m = number of overrides overlapping it
+    
     Args:
         schedule: Schedule configuration
         overrides: List of override periods
         from_time: Start of requested time window
         until_time: End of requested time window
+        as_columns: Return a dict of column arrays instead of Entry objects
         
     Returns:
-        Final schedule entries as a list of dicts
+        Final schedule entries as a tuple of Entry objects, with times in
+        handover_start_at's tzinfo, or, with as_columns, a dict with 'user',
+        'start_at' and 'end_at' arrays: user names, and UTC datetime64[us]
+        times, which convert back to datetime losslessly. The time arrays
+        are read-only.
     """
-    # Step 1: Generate base schedule
-    base_entries = generate_base_schedule(schedule, until_time)
+    # Nothing to render for an empty window or one that ends before the schedule starts
+    if until_time <= from_time or until_time <= schedule.handover_start_at:
+        return _to_columns(_empty_array([])) if as_columns else ()
     
-    # Step 2: Check for overrides and apply them
-    if overrides:
-        entries_with_overrides = apply_overrides(base_entries, overrides)
-    else:
-        entries_with_overrides = base_entries
+    # Overrides outside the window can't affect the result, and neither can
+    # repeats of the same override
+    overrides = tuple(dict.fromkeys(o for o in overrides if o.end_at > from_time and o.start_at < until_time))
     
-    # Step 3: Truncate to the requested time window
-    truncated_entries = truncate_to_window(entries_with_overrides, from_time, until_time)
+    # Both the entries and the merged ScheduleArray are cached, so as_columns
+    # calls share a pipeline run. The pipeline runs on the columnar
+    # ScheduleArray (_render_array), except for small windows, which build
+    # entries directly (_render_small)
+    if as_columns:
+        return _to_columns(_render_array(schedule, overrides, from_time, until_time))
+    return _render_entries(schedule, overrides, from_time, until_time)
+
+
+# Below this many shifts plus overrides in the window, render_schedule builds
+# its entries in plain Python: setting up the NumPy pipeline costs ~0.2 ms,
+# many times what the whole render takes at that size
+_SMALL_RENDER_SIZE = 64
+
+
+@functools.lru_cache(maxsize=256)
+def _render_entries(schedule: Schedule, overrides: tuple[Override, ...], from_time: datetime, until_time: datetime) -> tuple[Entry, ...]:
+    """Run the render_schedule pipeline and build its entries."""
+    from_ts, until_ts = _to_epoch(from_time), _to_epoch(until_time)
+    first, last = _shift_range(schedule, until_ts, from_ts)
+    if last - first + len(overrides) < _SMALL_RENDER_SIZE:
+        return _render_small(schedule, overrides, from_ts, until_ts, first, last)
+    return _render_array(schedule, overrides, from_time, until_time).to_entry_tuple()
+
+
+def _render_small(schedule: Schedule, overrides: tuple[Override, ...], from_ts: int, until_ts: int, first: int, last: int) -> tuple[Entry, ...]:
+    """
+    Run the render_schedule pipeline on plain ints, for small windows.
+
+    Gives the same entries as _render_array: the window is cut at every
+    shift boundary and override start and end, and each piece goes to the
+    latest started override covering it, or else to its shift. [first, last)
+    is the window's _shift_range, which must not be empty.
+    """
+    users = schedule.users
+    tz = schedule.handover_start_at.tzinfo
+    # Shift first + k covers [bounds[k], bounds[k + 1])
+    bounds = _shift_bounds(schedule, first, last).tolist()
+    shifts_from = max(from_ts, bounds[0])
+
+    # Overrides that overlap a shift apply in full, so only the window cuts
+    # them. Sorted (stably) by their own start, which decides which one wins
+    spans = sorted(((_to_epoch(o.start_at), _to_epoch(o.end_at), o.user) for o in overrides), key=itemgetter(0))
+    spans = [(max(ov_start, from_ts), min(ov_end, until_ts), user) for ov_start, ov_end, user in spans if ov_end > shifts_from]
+
+    cuts = {shifts_from, until_ts}
+    cuts.update(bounds[1:-1])
+    for ov_start, ov_end, _ in spans:
+        cuts.update((ov_start, ov_end))
+    cuts = sorted(cuts)
+
+    # Runs of [user, start, end], merged as they are built
+    runs: list[list] = []
+    shift = 0
+    for piece_start, piece_end in zip(cuts, cuts[1:]):
+        user = next((user for ov_start, ov_end, user in reversed(spans) if ov_start <= piece_start < ov_end), None)
+        if user is None:
+            if piece_start < shifts_from:
+                continue
+            while bounds[shift + 1] <= piece_start:
+                shift += 1
+            user = users[(first + shift) % len(users)]
+        if runs and runs[-1][0] == user and runs[-1][2] == piece_start:
+            runs[-1][2] = piece_end
+        else:
+            runs.append([user, piece_start, piece_end])
+
+    # As in ScheduleArray._datetimes, an entry starting where the previous
+    # one ends shares its datetime
+    entries = []
+    prev_end_ts, prev_end = None, None
+    for user, run_start, run_end in runs:
+        start_at = prev_end if run_start == prev_end_ts else _from_epoch(run_start, tz)
+        prev_end_ts, prev_end = run_end, _from_epoch(run_end, tz)
+        entries.append(Entry(user, start_at, prev_end))
+    return tuple(entries)
+
+
+@functools.lru_cache(maxsize=256)
+def _render_array(schedule: Schedule, overrides: tuple[Override, ...], from_time: datetime, until_time: datetime) -> ScheduleArray:
+    """Run the render_schedule pipeline. The returned arrays are read-only."""
+    from_ts, until_ts = _to_epoch(from_time), _to_epoch(until_time)
+
+    # Step 1: Generate the base schedule shifts overlapping the window,
+    # already truncated to it
+    table = _generate_base_array(schedule, until_ts, from_ts, clip=True)
     
-    # Step 4: Merge consecutive entries with the same user
-    merged_entries = merge_consecutive_entries(truncated_entries)
+    # Steps 2 and 3: Check for overrides and apply them. Overrides apply in
+    # full, so only then can entries extend past the window
+    if overrides:
+        table = _apply_overrides_array(table, overrides, _intern_users(schedule.users)[0])
+        table = _truncate_array(table, from_ts, until_ts)
     
-    return merged_entries
+    # Step 4: Merge consecutive entries with the same user
+    table = _merge_array(table)
+    for column in (table.starts, table.ends, table.user_ids):
+        column.setflags(write=False)
+    return table
 
 
-def truncate_to_window(entries: list[dict], from_time: datetime, until_time: datetime) -> list[dict]:
+def _to_columns(table: ScheduleArray) -> dict[str, np.ndarray]:
+    """Return the as_columns form of render_schedule's result, with read-only times."""
+    starts = table.starts.view('datetime64[us]')
+    ends = table.ends.view('datetime64[us]')
+    starts.setflags(write=False)
+    ends.setflags(write=False)
+    return {
+        'user': np.array(table.users, dtype=object)[table.user_ids],
+        'start_at': starts,
+        'end_at': ends
+    }
+
+
+def _truncate_array(table: ScheduleArray, from_ts: int, until_ts: int) -> ScheduleArray:
+    """Core of truncate_to_window, on epoch-microsecond times."""
+    # Plain NumPy already runs these in C over contiguous buffers; there is
+    # nothing for a JIT kernel to add
+    keep = (table.ends > from_ts) & (table.starts < until_ts)
+    return ScheduleArray(
+        starts=np.maximum(table.starts[keep], from_ts),
+        ends=np.minimum(table.ends[keep], until_ts),
+        user_ids=table.user_ids[keep],
+        users=table.users,
+        tz=table.tz
+    )
+
+
+def truncate_to_window(entries: list[dict] | ScheduleArray, from_time: datetime, until_time: datetime) -> list[dict] | ScheduleArray:
     """
     Truncate schedule entries to fit within the requested time window.
     
     Args:
-        entries: Schedule entries to truncate
+        entries: Schedule entries to truncate, as a list of dicts or a ScheduleArray
         from_time: Start of the time window
         until_time: End of the time window
         
     Returns:
-        Entries truncated to the time window
+        Entries truncated to the time window, in the same form as entries
     """
-    truncated_entries = []
-    for entry in entries:
-        if entry['end_at'] <= from_time or entry['start_at'] >= until_time:
-            continue
-        
-        # fit within the window
-        truncated_entry = {
-            'user': entry['user'],
-            'start_at': max(entry['start_at'], from_time),
-            'end_at': min(entry['end_at'], until_time)
-        }
-        truncated_entries.append(truncated_entry)
-    
-    return truncated_entries
+    if isinstance(entries, ScheduleArray):
+        return _truncate_array(entries, _to_epoch(from_time), _to_epoch(until_time))
+    return _truncate_array(ScheduleArray.from_entries(entries), _to_epoch(from_time), _to_epoch(until_time)).to_entries()
+
+
+def _merge_array(table: ScheduleArray) -> ScheduleArray:
+    """Core of merge_consecutive_entries (run-length encoding)."""
+    if len(table) == 0:
+        return table
+
+    # A run breaks wherever the user changes or there's a gap before the next entry
+    breaks = np.flatnonzero(
+        (table.user_ids[1:] != table.user_ids[:-1]) | (table.starts[1:] != table.ends[:-1])
+    )
+    run_starts = np.concatenate(([0], breaks + 1))
+    run_ends = np.concatenate((breaks, [len(table) - 1]))
 
+    return ScheduleArray(
+        starts=table.starts[run_starts],
+        ends=table.ends[run_ends],
+        user_ids=table.user_ids[run_starts],
+        users=table.users,
+        tz=table.tz
+    )
 
-def merge_consecutive_entries(entries: list[dict]) -> list[dict]:
+
+def merge_consecutive_entries(entries: list[dict] | ScheduleArray) -> list[dict] | ScheduleArray:
     """
     Merge consecutive entries with the same user.
     
     If a user has multiple consecutive shifts (e.g., due to override splits),
     combine them into a single entry.
     
+    A list of dicts is merged directly in a single pass, copying one dict
+    per run and tracking the run's end in a local until the run ends, since
+    converting to a ScheduleArray and back would cost more than the merge
+    itself. The input entries are not modified.
+    
     Args:
-        entries: Schedule entries to merge
+        entries: Schedule entries to merge, as a list of dicts or a ScheduleArray
         
     Returns:
-        Merged schedule entries
+        Merged schedule entries, in the same form as entries
     """
+    if isinstance(entries, ScheduleArray):
+        return _merge_array(entries)
+    
     if not entries:
         return []
     
-    merged_entries = []
-    current_merged = entries[0].copy()
+    current = dict(entries[0])
+    merged_entries = [current]
+    user, end_at = current['user'], current['end_at']
     
     for entry in entries[1:]:
-        if entry['user'] == current_merged['user'] and entry['start_at'] == current_merged['end_at']:
+        if entry['user'] == user and entry['start_at'] == end_at:
             # Merge
-            current_merged['end_at'] = entry['end_at']
+            end_at = entry['end_at']
         else:
-            merged_entries.append(current_merged)
-            current_merged = entry.copy()
-    
-    merged_entries.append(current_merged)
+            current['end_at'] = end_at
+            current = dict(entry)
+            merged_entries.append(current)
+            user, end_at = current['user'], current['end_at']
     
+    current['end_at'] = end_at
     return merged_entries
 
+
+def format_timestamp(dt: datetime) -> str:
+    """
+    Format a datetime as an ISO 8601 UTC timestamp, such as 2025-11-07T17:00:00Z.
+
+    Aware datetimes are converted to UTC first; naive datetimes are taken to
+    be UTC already.
+    """
+    # isoformat is implemented in C and, unlike strftime, has no format
+    # string to parse on every call
+    if dt.tzinfo is None:
+        return dt.isoformat(timespec='seconds') + 'Z'
+    return dt.astimezone(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')